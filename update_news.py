@@ -4,19 +4,40 @@ TechPulse News Updater
 Fetches latest AI, dev tools, and tech industry news and regenerates the site.
 
 Uses NewsAPI.org - Get your free API key at: https://newsapi.org/register
+Installing orjson (optional) speeds up parsing API responses.
 """
 
+import argparse
+import heapq
+import http.client
 import json
 import os
-import urllib.request
+import queue
+import sys
+import time
 import urllib.parse
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from html import escape
 
+try:
+    # Optional: orjson parses API responses faster and takes bytes directly
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 # Configuration
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_FILE = os.path.join(SCRIPT_DIR, "index.html")
 API_KEY_FILE = os.path.join(SCRIPT_DIR, ".newsapi_key")
+CACHE_FILE = os.path.join(SCRIPT_DIR, ".news_cache.json")
+CACHE_TTL_SECONDS = 10 * 60
+MAX_QUERY_LENGTH = 500  # NewsAPI's limit on the q parameter
+API_HOST = "newsapi.org"
+USER_AGENT = "TechPulse/1.0"
+
+# Idle keep-alive connections to API_HOST, shared by all fetches
+_connections = queue.LifoQueue()
 
 # News categories with search queries
 CATEGORIES = {
@@ -40,14 +61,83 @@ CATEGORIES = {
 
 def get_api_key():
     """Read API key from file or environment."""
-    if os.path.exists(API_KEY_FILE):
+    try:
         with open(API_KEY_FILE) as f:
             return f.read().strip()
-    return os.environ.get("NEWSAPI_KEY", "")
+    except FileNotFoundError:
+        return os.environ.get("NEWSAPI_KEY", "")
+
+
+def api_get(path):
+    """GET a path from the NewsAPI host, reusing a pooled connection."""
+    try:
+        conn, reused = _connections.get_nowait(), True
+    except queue.Empty:
+        conn, reused = http.client.HTTPSConnection(API_HOST, timeout=10), False
+    
+    try:
+        conn.request("GET", path, headers={"User-Agent": USER_AGENT})
+        response = conn.getresponse()
+        body = response.read()
+    except (http.client.HTTPException, OSError):
+        conn.close()
+        if reused:
+            # The server may have dropped the idle connection; retry on a fresh one
+            return api_get(path)
+        raise
+    
+    if response.will_close:
+        conn.close()
+    else:
+        _connections.put(conn)
+    
+    if response.status != 200:
+        raise http.client.HTTPException(f"HTTP {response.status} {response.reason}")
+    return body
+
+
+def close_connections():
+    """Close all idle pooled connections."""
+    while True:
+        try:
+            _connections.get_nowait().close()
+        except queue.Empty:
+            return
+
+
+def load_cache():
+    """Load cached API responses, or an empty cache if none is usable."""
+    try:
+        with open(CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    """Atomically write unexpired cache entries back to disk."""
+    now = time.time()
+    fresh = {
+        key: entry for key, entry in cache.items()
+        if now - entry["ts"] < CACHE_TTL_SECONDS
+    }
+    tmp_file = CACHE_FILE + ".tmp"
+    try:
+        with open(tmp_file, "w") as f:
+            json.dump(fresh, f)
+        os.replace(tmp_file, CACHE_FILE)
+    except OSError as e:
+        print(f"Error writing cache: {e}")
 
 
-def fetch_news(query, api_key, page_size=3):
-    """Fetch news from NewsAPI."""
+def fetch_news(query, api_key, page_size=3, cache=None):
+    """Fetch news from NewsAPI, serving fresh results from cache if given."""
+    cache_key = f"{page_size}:{query}"
+    if cache is not None:
+        entry = cache.get(cache_key)
+        if entry and time.time() - entry["ts"] < CACHE_TTL_SECONDS:
+            return entry["articles"]
+    
     params = urllib.parse.urlencode({
         "q": query,
         "language": "en",
@@ -55,41 +145,76 @@ def fetch_news(query, api_key, page_size=3):
         "pageSize": page_size,
         "apiKey": api_key,
     })
-    url = f"https://newsapi.org/v2/everything?{params}"
     
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "TechPulse/1.0"})
-        with urllib.request.urlopen(req, timeout=10) as response:
-            data = json.loads(response.read().decode())
-            return data.get("articles", [])
+        data = json_loads(api_get(f"/v2/everything?{params}"))
+        articles = data.get("articles", [])
+        if cache is not None:
+            cache[cache_key] = {"ts": time.time(), "articles": articles}
+        return articles
     except Exception as e:
         print(f"Error fetching news for '{query}': {e}")
         return []
 
 
-def fetch_category_news(category_queries, api_key):
+def normalize_url(url):
+    """Reduce a URL to (host, path) so tracking params don't defeat dedup."""
+    parts = urllib.parse.urlsplit(url)
+    return (parts.netloc.lower(), parts.path)
+
+
+def fetch_category_news(category_queries, api_key, cache=None):
     """Fetch news for a category using multiple queries."""
     all_articles = []
     seen_urls = set()
     
-    for query in category_queries:
-        articles = fetch_news(query, api_key, page_size=4)
+    # One combined query saves round trips; split it up only if it's too long
+    combined = " OR ".join(f"({query})" for query in category_queries)
+    if len(combined) <= MAX_QUERY_LENGTH:
+        results = [fetch_news(combined, api_key, page_size=12, cache=cache)]
+    else:
+        # Requests are I/O-bound, so issue them concurrently
+        with ThreadPoolExecutor(max_workers=len(category_queries)) as executor:
+            results = list(executor.map(
+                lambda query: fetch_news(query, api_key, page_size=4, cache=cache),
+                category_queries,
+            ))
+    
+    for articles in results:
         for article in articles:
             url = article.get("url", "")
-            if url and url not in seen_urls:
-                seen_urls.add(url)
+            if not url:
+                continue
+            key = normalize_url(url)
+            if key not in seen_urls:
+                seen_urls.add(key)
                 all_articles.append(article)
     
-    # Sort by date and return top 6
-    all_articles.sort(key=lambda x: x.get("publishedAt", ""), reverse=True)
-    return all_articles[:6]
+    # Return the 6 most recent
+    return heapq.nlargest(6, all_articles, key=lambda x: x.get("publishedAt", ""))
+
 
+if sys.version_info >= (3, 11):
+    # fromisoformat accepts a trailing "Z" natively from 3.11 on
+    parse_iso_date = datetime.fromisoformat
+else:
+    def parse_iso_date(iso_date):
+        """Parse an ISO 8601 timestamp, slicing the common UTC form directly."""
+        if len(iso_date) >= 20 and iso_date[-1] == "Z" and iso_date[10] == "T":
+            return datetime(
+                int(iso_date[0:4]), int(iso_date[5:7]), int(iso_date[8:10]),
+                int(iso_date[11:13]), int(iso_date[14:16]), int(iso_date[17:19]),
+                tzinfo=timezone.utc,
+            )
+        return datetime.fromisoformat(iso_date)
 
-def format_date(iso_date):
-    """Format ISO date to readable string."""
+
+def format_date(iso_date, now):
+    """Format ISO date to readable string relative to the aware datetime now."""
+    if not iso_date:
+        return ""
     try:
-        dt = datetime.fromisoformat(iso_date.replace("Z", "+00:00"))
-        now = datetime.now(dt.tzinfo)
+        dt = parse_iso_date(iso_date)
         diff = now - dt
         
         if diff.days == 0:
@@ -103,25 +228,27 @@ def format_date(iso_date):
             return f"{diff.days} days ago"
         else:
             return dt.strftime("%b %d")
-    except:
+    except (ValueError, TypeError):
         return ""
 
 
-def generate_story_html(article, featured=False):
+def generate_story_html(article, now, featured=False):
     """Generate HTML for a single story card."""
-    title = escape(article.get("title", "Untitled") or "Untitled")
+    title = article.get("title") or "Untitled"
     # Clean up titles that end with " - Source Name"
     if " - " in title:
         title = title.rsplit(" - ", 1)[0]
+    title = escape(title)
     
     url = escape(article.get("url", "#"))
     source = escape(article.get("source", {}).get("name", "Unknown"))
-    date = format_date(article.get("publishedAt", ""))
-    description = escape(article.get("description", "") or "")
+    date = format_date(article.get("publishedAt", ""), now)
+    description = article.get("description") or ""
     
-    # Truncate description
+    # Truncate before escaping so we never cut an entity in half
     if len(description) > 150:
         description = description[:147] + "..."
+    description = escape(description)
     
     css_class = "story featured" if featured else "story"
     
@@ -135,116 +262,94 @@ def generate_story_html(article, featured=False):
                 </a>'''
 
 
-def generate_html(news_by_category):
-    """Generate the complete HTML page."""
-    today = datetime.now().strftime("%B %d, %Y")
-    
-    sections_html = ""
-    for category, articles in news_by_category.items():
-        if not articles:
-            continue
-        
-        stories_html = "\n".join(
-            generate_story_html(article, featured=(i == 0))
-            for i, article in enumerate(articles)
-        )
-        
-        sections_html += f'''
-        <section class="section">
-            <h2 class="section-title">{category}</h2>
-            <div class="stories">
-{stories_html}
-            </div>
-        </section>
-'''
-    
-    return f'''<!DOCTYPE html>
+# Static page shell; only the header and footer carry per-run values
+HTML_HEAD = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Tech Pulse | AI • Dev Tools • Industry</title>
     <style>
-        :root {{
+        :root {
             --bg: #fafafa;
             --card: #ffffff;
             --text: #1a1a1a;
             --muted: #666;
             --accent: #2563eb;
             --border: #e5e5e5;
-        }}
+        }
         
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
         
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             background: var(--bg);
             color: var(--text);
             line-height: 1.6;
-        }}
+        }
         
-        header {{
+        header {
             background: var(--card);
             border-bottom: 1px solid var(--border);
             padding: 1.5rem 2rem;
             position: sticky;
             top: 0;
             z-index: 100;
-        }}
+        }
         
-        .header-content {{
+        .header-content {
             max-width: 1200px;
             margin: 0 auto;
             display: flex;
             justify-content: space-between;
             align-items: center;
-        }}
+        }
         
-        .logo {{
+        .logo {
             font-size: 1.5rem;
             font-weight: 700;
             color: var(--text);
             text-decoration: none;
-        }}
+        }
         
-        .logo span {{
+        .logo span {
             color: var(--accent);
-        }}
+        }
         
-        .date {{
+        .date {
             color: var(--muted);
             font-size: 0.875rem;
-        }}
+        }
         
-        main {{
+        main {
             max-width: 1200px;
             margin: 0 auto;
             padding: 2rem;
-        }}
+        }
         
-        .section {{
+        .section {
             margin-bottom: 3rem;
-        }}
+        }
         
-        .section-title {{
+        .section-title {
             font-size: 0.75rem;
             text-transform: uppercase;
             letter-spacing: 0.1em;
             color: var(--accent);
             margin-bottom: 1rem;
             font-weight: 600;
-        }}
+        }
         
-        .stories {{
+        .stories {
             display: grid;
             gap: 1rem;
-        }}
+        }
         
-        .story {{
+        .story {
             background: var(--card);
             border: 1px solid var(--border);
             border-radius: 8px;
@@ -252,75 +357,77 @@ def generate_html(news_by_category):
             text-decoration: none;
             color: inherit;
             transition: box-shadow 0.2s, transform 0.2s;
-        }}
+        }
         
-        .story:hover {{
+        .story:hover {
             box-shadow: 0 4px 12px rgba(0,0,0,0.08);
             transform: translateY(-2px);
-        }}
+        }
         
-        .story-title {{
+        .story-title {
             font-size: 1.1rem;
             font-weight: 600;
             margin-bottom: 0.5rem;
             color: var(--text);
-        }}
+        }
         
-        .story-meta {{
+        .story-meta {
             display: flex;
             gap: 1rem;
             font-size: 0.8rem;
             color: var(--muted);
-        }}
+        }
         
-        .story-source {{
+        .story-source {
             font-weight: 500;
-        }}
+        }
         
-        .story-excerpt {{
+        .story-excerpt {
             margin-top: 0.75rem;
             font-size: 0.9rem;
             color: var(--muted);
-        }}
+        }
         
-        .featured {{
+        .featured {
             grid-column: 1 / -1;
             background: linear-gradient(135deg, #1e3a8a 0%, #3b82f6 100%);
             color: white;
-        }}
+        }
         
-        .featured .story-title {{
+        .featured .story-title {
             color: white;
             font-size: 1.4rem;
-        }}
+        }
         
         .featured .story-meta,
-        .featured .story-excerpt {{
+        .featured .story-excerpt {
             color: rgba(255,255,255,0.85);
-        }}
+        }
         
-        @media (min-width: 768px) {{
-            .stories {{
+        @media (min-width: 768px) {
+            .stories {
                 grid-template-columns: repeat(2, 1fr);
-            }}
-        }}
+            }
+        }
         
-        @media (min-width: 1024px) {{
-            .stories {{
+        @media (min-width: 1024px) {
+            .stories {
                 grid-template-columns: repeat(3, 1fr);
-            }}
-        }}
+            }
+        }
         
-        footer {{
+        footer {
             text-align: center;
             padding: 2rem;
             color: var(--muted);
             font-size: 0.875rem;
             border-top: 1px solid var(--border);
-        }}
+        }
     </style>
 </head>
-<body>
+'''
+
+HTML_HEADER_FMT = '''<body>
     <header>
         <div class="header-content">
             <a href="#" class="logo">Tech<span>Pulse</span></a>
@@ -328,7 +435,9 @@ def generate_html(news_by_category):
         </div>
     </header>
     
-    <main>{sections_html}
+    <main>'''
+
+HTML_FOOTER_FMT = '''
     </main>
     
     <footer>
@@ -339,7 +448,51 @@ def generate_html(news_by_category):
 '''
 
 
+def generate_section_html(category, articles, now):
+    """Generate HTML for one category section."""
+    stories_html = "\n".join(
+        generate_story_html(article, now, featured=(i == 0))
+        for i, article in enumerate(articles)
+    )
+    
+    return f'''
+        <section class="section">
+            <h2 class="section-title">{category}</h2>
+            <div class="stories">
+{stories_html}
+            </div>
+        </section>
+'''
+
+
+def generate_html(news_by_category, now):
+    """Generate the complete HTML page as of the aware datetime now."""
+    today = now.astimezone().strftime("%B %d, %Y")
+    
+    # Empty categories get no section
+    sections_html = "".join(
+        generate_section_html(category, articles, now)
+        for category, articles in news_by_category.items()
+        if articles
+    )
+    
+    return (
+        HTML_HEAD
+        + HTML_HEADER_FMT.format(today=today)
+        + sections_html
+        + HTML_FOOTER_FMT.format(today=today)
+    )
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Regenerate the TechPulse site.")
+    parser.add_argument(
+        "--force-refresh",
+        action="store_true",
+        help="ignore cached API responses and fetch everything again",
+    )
+    args = parser.parse_args()
+    
     api_key = get_api_key()
     
     if not api_key:
@@ -349,20 +502,34 @@ def main():
         print("Get a free key at: https://newsapi.org/register")
         return 1
     
-    print(f"Fetching news at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}...")
+    now = datetime.now(timezone.utc)
+    print(f"Fetching news at {now.astimezone().strftime('%Y-%m-%d %H:%M:%S')}...")
+    
+    cache = {} if args.force_refresh else load_cache()
     
-    news_by_category = {}
-    for category, queries in CATEGORIES.items():
-        print(f"  Fetching {category}...")
-        news_by_category[category] = fetch_category_news(queries, api_key)
+    with ThreadPoolExecutor(max_workers=len(CATEGORIES)) as executor:
+        futures = {}
+        for category, queries in CATEGORIES.items():
+            print(f"  Fetching {category}...")
+            futures[category] = executor.submit(
+                fetch_category_news, queries, api_key, cache
+            )
+        news_by_category = {
+            category: future.result() for category, future in futures.items()
+        }
+    close_connections()
+    save_cache(cache)
     
     total = sum(len(articles) for articles in news_by_category.values())
     print(f"  Found {total} articles")
     
-    html = generate_html(news_by_category)
+    html = generate_html(news_by_category, now)
     
-    with open(OUTPUT_FILE, "w") as f:
-        f.write(html)
+    # Write to a temp file and swap it in so readers never see a partial page
+    tmp_file = OUTPUT_FILE + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(html.encode("utf-8"))
+    os.replace(tmp_file, OUTPUT_FILE)
     
     print(f"Updated: {OUTPUT_FILE}")
     return 0